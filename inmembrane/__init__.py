@@ -2,6 +2,7 @@ __version__ = "0.95.0"  # Must be a semantic version number
 import helpers
 
 import os, shutil
+import ast, copy
 
 module_dir = os.path.abspath(os.path.dirname(__file__))
 
@@ -9,6 +10,8 @@ default_params_str = """{
   'fasta': '',
   'csv': '',
   'out_dir': '',
+# 'json': '', # also write all annotations to this JSON file
+# 'sqlite': '', # also store the classifications in this SQLite database
   'protocol': 'gram_pos', # 'gram_neg'
   
 #### Signal peptide and transmembrane helix prediction
@@ -38,6 +41,10 @@ default_params_str = """{
 }
 """
 
+# {config filename: (modification time, params)}, so that the config
+# file is only parsed again if it has changed
+_params_cache = {}
+
 
 def get_params():
     from helpers import log_stderr
@@ -61,8 +68,14 @@ def get_params():
         fh.close()
     else:
         log_stderr("# Loading existing inmembrane.config")
-    params = eval(open(config).read())
-    return params
+    mtime = os.path.getmtime(config)
+    if config not in _params_cache or _params_cache[config][0] != mtime:
+        # the config is a plain dictionary literal, so it never needs
+        # the full power of eval
+        params = ast.literal_eval(open(config).read())
+        _params_cache[config] = (mtime, params)
+    # callers fill in params as they go, so hand out a fresh copy
+    return copy.deepcopy(_params_cache[config][1])
 
 
 def init_output_dir(params):
@@ -88,6 +101,12 @@ def init_output_dir(params):
     params['citations'] = os.path.join(params['out_dir'], 'citations.txt')
     params['citations'] = os.path.abspath(params['citations'])
 
+    if dict_get(params, 'json'):
+        params['json'] = os.path.abspath(params['json'])
+
+    if dict_get(params, 'sqlite'):
+        params['sqlite'] = os.path.abspath(params['sqlite'])
+
     fasta = "input.fasta"
     shutil.copy(params['fasta'], os.path.join(base_dir, fasta))
     params['fasta'] = fasta
@@ -119,11 +138,14 @@ def process(params):
     'protocol'. Then outputs to screen and a .csv file.
     """
     from helpers import dict_get, create_proteins_dict, log_stdout, log_stderr
+    from helpers import write_proteins_json, write_proteins_sqlite
     # will load all plugins in the plugins/ directory
     from inmembrane.plugins import *
 
     # initializations
     exec (import_protocol_python(params))
+    # init_output_dir renames the copied input, so keep the original name
+    source = os.path.basename(params['fasta'])
     init_output_dir(params)
     seqids, proteins = create_proteins_dict(params['fasta'])
 
@@ -138,23 +160,36 @@ def process(params):
         plugin = eval(plugin_str)
         plugin.annotate(params, proteins)
 
-    # do protocol analysis on the results of the annotations
+    # do protocol analysis on the results of the annotations, collecting
+    # the output lines so they go to stdout in a single write
+    output_lines = []
     for seqid in seqids:
         protein = proteins[seqid]
         protocol.post_process_protein(params, protein)
-        log_stdout(protocol.protein_output_line(seqid, proteins))
+        output_lines.append(protocol.protein_output_line(seqid, proteins))
+    if output_lines:
+        log_stdout("\n".join(output_lines))
 
     # print a summary table of classifications to stderr
     log_stderr(protocol.summary_table(params, proteins))
 
     # always write to biologist-friendly csv file
     f = open(params['csv'], 'w')
-    for seqid in seqids:
-        f.write(protocol.protein_csv_line(seqid, proteins))
+    f.write(''.join(
+        [protocol.protein_csv_line(seqid, proteins) for seqid in seqids]))
     f.close()
     log_stderr("\n")
     log_stderr("Output written to %s" % (params['csv']))
 
+    # optionally dump the results for downstream tools
+    if dict_get(params, 'json'):
+        write_proteins_json(params['json'], proteins)
+        log_stderr("Annotations written to %s" % (params['json']))
+
+    if dict_get(params, 'sqlite'):
+        write_proteins_sqlite(params['sqlite'], proteins, source)
+        log_stderr("Classifications stored in %s" % (params['sqlite']))
+
     # TODO: citations for specific HMMs (PFAM etc ?)
 
     # write citations to a file and gracefully deal with plugins
@@ -4,12 +4,25 @@
 
 import inmembrane
 import os, subprocess, sys, re
+import functools
+import multiprocessing
+import json
+import sqlite3
+from distutils.spawn import find_executable
 from collections import OrderedDict
 import textwrap
 from bs4 import BeautifulSoup
 
 LOG_SILENT = False
 
+# {binary: is it there?}, so run() only searches the PATH once per binary
+_found_binaries = {}
+
+# seconds to wait for a pool of jobs in map_in_pool, much longer than
+# any run should take; a wait without a timeout can't be interrupted
+# with Ctrl-C in Python 2
+POOL_TIMEOUT = 7 * 24 * 60 * 60
+
 
 def dict_get(this_dict, prop):
     """
@@ -23,40 +36,102 @@ def dict_get(this_dict, prop):
     return this_dict[prop]
 
 
+def memoize(f):
+    """
+    Caches the return values of a function that takes hashable
+    arguments, a stand-in for functools.lru_cache which isn't
+    available in Python 2. Only use it on functions that return
+    immutable values, since the same object is handed to every caller.
+    The cache grows without bound until the clear_cache() attribute of
+    the memoized function is called.
+    """
+    cache = {}
+
+    @functools.wraps(f)
+    def memoized(*args):
+        try:
+            return cache[args]
+        except KeyError:
+            result = cache[args] = f(*args)
+            return result
+
+    memoized.clear_cache = cache.clear
+    return memoized
+
+
+def split_command(cmd):
+    """
+    Splits a command line on whitespace for running without a shell,
+    expanding '~' and environment variables in each argument as a shell
+    would, eg. for a configured binary of '~/bin/signalp'.
+    """
+    return [os.path.expandvars(os.path.expanduser(arg))
+            for arg in cmd.split()]
+
+
 def run_with_output(cmd):
     """
     Runs an external program as a child process and captures
-    the input. May not work with external programs that include
-    complicated levels of shells.
+    the output. The command is split on whitespace and run without
+    a shell, so pipes, redirection and quoting aren't supported.
     """
     p = subprocess.Popen(
-        cmd, shell=True, stdout=subprocess.PIPE,
+        split_command(cmd), stdout=subprocess.PIPE,
         stderr=subprocess.PIPE)
-    return p.stdout.read()
+    return p.communicate()[0]
 
 
-def run(cmd, out_file=None):
+def run(cmd, out_file=None, cwd=None):
     """
     Wrapper function to run external program so that existence
     of binary can be checked and the output directed to a specific
-    file.
+    file. If cwd is given, the program is run in that directory.
     """
-    log_stderr("# " + cmd + " > " + out_file)
-    if os.path.isfile(out_file) and (out_file != None):
+    if out_file and os.path.isfile(out_file):
         log_stderr("# -> skipped: %s already exists" % out_file)
         return
-    binary = cmd.split()[0]
-    is_binary_there = False
-    if os.path.isfile(binary):
-        is_binary_there = True
-    if run_with_output('which ' + binary):
-        is_binary_there = True
-    if not is_binary_there:
+    args = split_command(cmd)
+    binary = args[0]
+    if binary not in _found_binaries:
+        _found_binaries[binary] = os.path.isfile(binary) or \
+                                  find_executable(binary) is not None
+    if not _found_binaries[binary]:
         raise IOError("Couldn't find executable binary '" + binary + "'")
+    if cwd and os.path.isfile(binary):
+        # a relative path to the binary would be looked up from cwd
+        args[0] = os.path.abspath(binary)
     if out_file:
-        os.system(cmd + " > " + out_file)
+        log_stderr("# " + cmd + " > " + out_file)
+        fh = open(out_file, 'w')
+        try:
+            subprocess.call(args, stdout=fh, cwd=cwd)
+        finally:
+            fh.close()
+    else:
+        log_stderr("# " + cmd)
+        subprocess.call(args, cwd=cwd)
+
+
+def map_in_pool(func, jobs):
+    """
+    Maps func over a list of jobs in a pool of worker processes, one per
+    processor, and returns the list of results in the order of the jobs.
+    func must be a module-level function so that it can be pickled. A
+    single job is run directly, rather than forking a pool for it.
+    """
+    if len(jobs) <= 1:
+        return [func(job) for job in jobs]
+    pool = multiprocessing.Pool(min(multiprocessing.cpu_count(), len(jobs)))
+    try:
+        results = pool.map_async(func, jobs).get(POOL_TIMEOUT)
+    except:
+        pool.terminate()
+        raise
     else:
-        os.system(cmd)
+        pool.close()
+    finally:
+        pool.join()
+    return results
 
 
 def silence_log(b):
@@ -89,6 +164,11 @@ def log_stdout(s, width=76):
     print s
 
 
+# NCBI-style ids start with a short database tag, eg "gi|ginumber|gb|..."
+_ncbi_seqid_re = re.compile(r'>?([^|]{0,3})\|\s*([^|\s]+)')
+
+
+@memoize
 def parse_fasta_header(header):
     """
     Parses a FASTA format header (with our without the initial '>') and returns a
@@ -97,20 +177,21 @@ def parse_fasta_header(header):
     If NCBI SeqID format (gi|gi-number|gb|accession etc, is detected
     the first id in the list is used as the canonical id (see see
     http://www.ncbi.nlm.nih.gov/books/NBK21097/#A631 ).
+
+    Results are memoized since the same headers are parsed again from
+    the output of every plugin.
     """
-    if header[0] == '>':
-        header = header[1:]
-    tokens = header.split('|')
-    # check to see if we have an NCBI-style header
-    if header.find("|") != -1 and len(tokens[0]) <= 3:
+    match = _ncbi_seqid_re.match(header)
+    if match:
         # "gi|ginumber|gb|accession bla bla" becomes "gi|ginumber"
-        seqid = "%s|%s" % (tokens[0], tokens[1].split()[0])
-        name = tokens[-1:][0].strip()
+        seqid = "%s|%s" % match.groups()
+        name = header.rsplit('|', 1)[-1].strip()
     # otherwise just split on spaces & hope for the best
     else:
-        tokens = header.split()
-        seqid = tokens[0]
-        name = header[0:-1].strip()
+        if header[0] == '>':
+            header = header[1:]
+        seqid = header.split(None, 1)[0]
+        name = header.strip()
 
     return seqid, name
 
@@ -130,23 +211,26 @@ def create_proteins_dict(fasta):
     of seqID's in the same order as that in the source FASTA file.
     """
     seqids = []
-    seqid = None
     proteins = OrderedDict()
-    for l in open(fasta):
-        if l.startswith(">"):
-            seqid, name = parse_fasta_header(l)
-            seqids.append(seqid)
-            proteins[seqid] = {
-                'seq': "",
-                'name': name,
-                'original_header': l[1:].rstrip('\n').rstrip('\r'),
-            }
-            continue
-        if seqid is not None:
-            words = l.split()
-            if words:
-                proteins[seqid]['seq'] += words[0]
-        proteins[seqid]['sequence_length'] = len(proteins[seqid]['seq'])
+    fh = open(fasta, 'rb')
+    # split the whole file into records in one pass rather than
+    # looping over it line by line; the leading newline makes a header
+    # on the first line look like every other header
+    records = ('\n' + fh.read()).split('\n>')
+    fh.close()
+    # anything before the first header is ignored
+    for record in records[1:]:
+        header, _, body = record.partition('\n')
+        header = header.rstrip('\r')
+        seqid, name = parse_fasta_header(header)
+        seqids.append(seqid)
+        seq = body.translate(None, ' \t\r\n')
+        proteins[seqid] = {
+            'seq': seq,
+            'name': name,
+            'original_header': header,
+            'sequence_length': len(seq),
+        }
 
     proteins, id_mapping = generate_safe_seqids(proteins)
 
@@ -182,6 +266,66 @@ def write_proteins_fasta(
     f.close()
 
 
+def decode_strings(value):
+    """
+    Returns a copy of a nested structure of dicts, lists and tuples with
+    all byte strings decoded as UTF-8. Headers can be in any encoding,
+    so undecodable bytes are replaced rather than raising an error.
+    """
+    if isinstance(value, str):
+        return value.decode('utf-8', 'replace')
+    if isinstance(value, dict):
+        return value.__class__(
+            (decode_strings(k), decode_strings(v))
+            for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return [decode_strings(v) for v in value]
+    return value
+
+
+def write_proteins_json(json_filename, proteins):
+    """
+    Writes the whole proteins dictionary, with all annotations, to
+    a JSON file in a single compact dump.
+    """
+    # decode before opening the file, so a bad header can never leave
+    # a truncated file behind
+    out = json.dumps(decode_strings(proteins), separators=(',', ':'))
+    f = open(json_filename, "w")
+    f.write(out)
+    f.close()
+
+
+def write_proteins_sqlite(db_filename, proteins, source):
+    """
+    Stores the classification of each protein in the 'proteins' table of
+    an SQLite database, in a single transaction. Rows are keyed on the
+    source of the proteins (eg. the name of the FASTA file) and the
+    sequence id, so several proteomes can share a database even if their
+    ids overlap. Rows for ids already stored for the source are replaced.
+    """
+    conn = sqlite3.connect(db_filename)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS proteins ("
+            "source TEXT, seqid TEXT, category TEXT, loop_extent TEXT, "
+            "details TEXT, name TEXT, PRIMARY KEY (source, seqid))")
+        conn.executemany(
+            "INSERT OR REPLACE INTO proteins VALUES (?, ?, ?, ?, ?, ?)",
+            [decode_strings((source,
+                             seqid,
+                             protein['category'],
+                             protein.get('loop_extent'),
+                             ";".join(protein['details']),
+                             protein['name']))
+             for seqid, protein in proteins.items()])
+        conn.commit()
+    finally:
+        conn.close()
+
+
 def proteins_to_fasta(proteins, seqids=[], use_safe_seqid=False, width=50):
     """
     Takes a proteins dictionary and returns a string containing
@@ -217,30 +361,22 @@ def chop_nterminal_peptide(protein, i_cut):
     protein['sequence_length'] -= i_cut
     for prop in protein:
         if '_loops' in prop or '_helices' in prop:
-            sses = protein[prop]
-            for i in range(len(sses)):
-                j, k = sses[i]
-                sses[i] = (j - i_cut, k - i_cut)
-    for prop in protein:
-        if '_loops' in prop or '_helices' in prop:
-            sses = protein[prop]
-            for i in reversed(range(len(sses))):
-                j, k = sses[i]
-                # tests if this loop or TM-helix has been cut out
-                if j <= 0 and k <= 0:
-                    del sses[i]
-                # otherewise, neg value means loop or TM-helix is at the new N-terminal
-                elif j <= 0 and k > 0:
-                    sses[i] = (1, k)
-                    # if a TM-helix gets cut in half and becomes a new N-terminal,
-                    # convert the remaining residues to a loop and remove the helix
-                    if '_helices' in prop:
-                        program = prop.split('_')[0]
-                        for x in protein:
-                            if x == '%s_loops' % program:
-                                new_N_loop = protein[x][0]
-                                new_N_loop[0] = 1
-                        del sses[i]
+            is_helices = '_helices' in prop
+            sses = []
+            for j, k in protein[prop]:
+                j -= i_cut
+                k -= i_cut
+                if j <= 0:
+                    # tests if this loop or TM-helix has been cut out
+                    if k <= 0:
+                        continue
+                    # a TM-helix cut in half at the new N-terminal is removed
+                    if is_helices:
+                        continue
+                    # otherwise a loop now starts at the new N-terminal
+                    j = 1
+                sses.append((j, k))
+            protein[prop][:] = sses
 
 
 def generate_safe_seqids(proteins):
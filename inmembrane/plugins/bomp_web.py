@@ -9,16 +9,19 @@ citation = {'ref': u"﻿Berven FS, Flikka K, Jensen HB, Eidhammer I (2004) "
             'name': "BOMP"
             }
 
-import sys, os, time, StringIO
+import os, time, re
+from urlparse import urljoin
 
-import twill
-from twill.commands import find, formfile, follow, fv, go, show, \
-    showforms, showlinks, submit, agent
-from BeautifulSoup import BeautifulSoup
+import requests
+import lxml.html
 
 import inmembrane
 from inmembrane.helpers import log_stderr, parse_fasta_header
 
+# seconds to wait for the server to respond to any single request,
+# so that a stalled connection fails instead of hanging the run
+request_timeout = 120
+
 
 def annotate(params, proteins, \
              url="http://services.cbu.uib.no/tools/bomp/", force=False):
@@ -26,11 +29,6 @@ def annotate(params, proteins, \
     Uses the BOMP web service (http://services.cbu.uib.no/tools/bomp/) to
     predict if proteins are outer membrane beta-barrels.
     """
-    # set the user-agent so web services can block us if they want ... :/
-    python_version = sys.version.split()[0]
-    agent("Python-urllib/%s (twill; inmembrane/%s)" %
-          (python_version, inmembrane.__version__))
-
     bomp_out = 'bomp.out'
     log_stderr("# BOMP(web) %s > %s" % (params['fasta'], bomp_out))
 
@@ -47,45 +45,48 @@ def annotate(params, proteins, \
         fh.close()
         return bomp_categories
 
-    # dump extraneous output into this blackhole so we don't see it
-    if not __DEBUG__: twill.set_output(StringIO.StringIO())
-
-    go(url)
-    if __DEBUG__: showforms()
-    formfile("1", "queryfile", params["fasta"])
-    submit()
-    if __DEBUG__: show()
+    # set the user-agent so web services can block us if they want ... :/
+    session = requests.Session()
+    session.headers["User-Agent"] = "python-requests/%s (inmembrane/%s)" % \
+                                    (requests.__version__,
+                                     inmembrane.__version__)
+
+    # submit the FASTA file through the first form on the page, keeping
+    # the form's default values, the same way a browser would
+    r = session.get(url, timeout=request_timeout)
+    page = lxml.html.fromstring(r.text, base_url=url)
+    form = page.forms[0]
+    fh = open(params["fasta"], 'rb')
+    r = session.post(form.action or url,
+                     data=dict(form.form_values()),
+                     files={'queryfile': fh},
+                     timeout=request_timeout)
+    fh.close()
+    if __DEBUG__: log_stderr(r.text)
 
     # extract the job id from the page
-    links = showlinks()
-    job_id = None
-    for l in links:
-        if l.url.find("viewOutput") != -1:
-            # grab job id from "viewOutput?id=16745338"
-            job_id = int(l.url.split("=")[1])
-
-    if __DEBUG__: log_stderr("BOMP job id: %d" % job_id)
-
-    if not job_id:
+    # grab job id from "viewOutput?id=16745338"
+    match = re.search(r'viewOutput\?id=(\d+)', r.text)
+    if not match:
         # something went wrong
         log_stderr("# BOMP error: Can't find job id")
         return
+    job_id = int(match.group(1))
 
-    # parse the HTML table and extract categories
-    go("viewOutput?id=%i" % (job_id))
+    if __DEBUG__: log_stderr("BOMP job id: %d" % job_id)
+
+    result_url = urljoin(r.url, "viewOutput?id=%i" % (job_id))
 
     polltime = 10
     log_stderr("# Waiting for BOMP to finish .")
     while True:
-        try:
-            find("Not finished")
-            log_stderr(".")
-        except:
-            # Finished ! Pull down the result page.
+        bomp_html = session.get(result_url,
+                                timeout=request_timeout).text
+        if __DEBUG__: log_stderr(bomp_html)
+        if "Not finished" not in bomp_html:
             log_stderr(". done!\n")
-            go("viewOutput?id=%i" % (job_id))
-            if __DEBUG__: log_stderr(show())
             break
+        log_stderr(".")
 
         # Not finished. We keep polling for a time until
         # we give up
@@ -94,20 +95,14 @@ def annotate(params, proteins, \
         if polltime >= 7200:  # 2 hours
             log_stderr("# BOMP error: Taking too long.")
             return
-        go("viewOutput?id=%i" % (job_id))
-        if __DEBUG__: log_stderr(show())
-
-    bomp_html = show()
-    if __DEBUG__: log_stderr(bomp_html)
 
     # Results are in the only <table> on this page, formatted like:
     # <tr><th>gi|107836852|gb|ABF84721.1<th>5</tr>
-    soup = BeautifulSoup(bomp_html)
     bomp_categories = {}  # dictionary of {name, category} pairs
-    for tr in soup.findAll('tr')[1:]:
-        n, c = tr.findAll('th')
-        name = parse_fasta_header(n.text.strip())[0]
-        category = int(c.text)
+    for tr in lxml.html.fromstring(bomp_html).xpath('//table//tr')[1:]:
+        n, c = [th.text_content() for th in tr.xpath('th')]
+        name = parse_fasta_header(n.strip())[0]
+        category = int(c)
         bomp_categories[name] = category
 
     # write BOMP results to a tab delimited file
@@ -137,9 +132,9 @@ def annotate(params, proteins, \
     #
     # use the job id to jump straight to the fasta results
     # if a sequence is here, it's classified as an OMP barrel
-    go("viewFasta?id=%i" % (job_id))
-    bomp_seqs = show()
-    bomp_fasta_headers = read_fasta_keys(StringIO.StringIO(show()))
+    r = session.get(urljoin(r.url, "viewFasta?id=%i" % (job_id)),
+                    timeout=request_timeout)
+    bomp_fasta_headers = read_fasta_keys(StringIO.StringIO(r.text))
     # label the predicted TMBs
     for name in bomp_fasta_headers:
       proteins[name]['bomp'] = True
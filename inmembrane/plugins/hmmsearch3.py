@@ -3,8 +3,50 @@
 citation = {'ref': "http://hmmer.org", 'name': 'HMMER 3.0'}
 
 import os
+import re
 import glob
-from inmembrane.helpers import log_stderr, run, parse_fasta_header
+from inmembrane.helpers import log_stderr, run, parse_fasta_header, \
+    map_in_pool
+
+# matches the only two kinds of lines we need from hmmsearch output:
+#   >> SPy_1392  SPy_1392 from AE004092
+#   == domain 1  score: 25.3 bits;  conditional E-value: 1.2e-08
+hmmsearch_hit_re = re.compile(
+    r'^>> (.*)$|score: *(\S+) bits.*conditional E-value: *(\S+)\s*$', re.M)
+
+
+def search_hmm_profile(job):
+    """
+    Runs hmmsearch for a single HMM profile and returns a tuple of the
+    profile name and the list of seqids that pass the E-value and score
+    cutoffs. Takes a (params, cmd_template, hmm_profile) tuple so that
+    it can be mapped over a multiprocessing pool.
+    """
+    params, cmd_template, hmm_profile = job
+
+    hmm_name = os.path.basename(hmm_profile).replace('.hmm', '')
+    hmmsearch3_out = 'hmm.%s.out' % hmm_name
+
+    run(cmd_template % hmm_profile, hmmsearch3_out)
+
+    # parse the hmmsearch output file
+    hits = []
+    seqid = None
+    for match in hmmsearch_hit_re.finditer(open(hmmsearch3_out).read()):
+        header, score, evalue = match.groups()
+
+        if header is not None:
+            seqid = parse_fasta_header(header)[0]
+            continue
+
+        if seqid is None:
+            continue
+
+        if float(evalue) <= params['hmm_evalue_max'] and \
+                float(score) >= params['hmm_score_min']:
+            hits.append(seqid)
+
+    return hmm_name, hits
 
 
 def annotate(params, proteins):
@@ -16,44 +58,33 @@ def annotate(params, proteins):
       - 'hmmsearch': a list of motifs that are found in the protein. The
          motifs correspond to the basename of the .hmm files found in the directory
          indicated by the 'hmm_profiles_dir' field of 'params'.
+
+    Each profile is searched independently, so the hmmsearch runs are
+    spread over a pool of worker processes.
     """
 
     log_stderr(
         "# Searching for HMMER profiles in " + params['hmm_profiles_dir'])
 
+    # init proteins data structure with blank hmmsearch field first
+    for seqid in proteins:
+        if 'hmmsearch' not in proteins[seqid]:
+            proteins[seqid]['hmmsearch'] = []
+
+    # only the profile changes from one hmmsearch run to the next
+    cmd_template = '%s -Z 2000 -E 10 %%s %s' % \
+                   (params['hmmsearch3_bin'], params['fasta'])
     file_tag = os.path.join(params['hmm_profiles_dir'], '*.hmm')
-    for hmm_profile in glob.glob(file_tag):
-        params['hmm_profile'] = hmm_profile
-
-        hmm_profile = os.path.basename(params['hmm_profile'])
-        hmm_name = hmm_profile.replace('.hmm', '')
-        hmmsearch3_out = 'hmm.%s.out' % hmm_name
-
-        cmd = '%(hmmsearch3_bin)s -Z 2000 -E 10 %(hmm_profile)s %(fasta)s' % params
-        run(cmd, hmmsearch3_out)
-
-        # init proteins data structure with blank hmmsearch field first
-        for seqid in proteins:
-            if 'hmmsearch' not in proteins[seqid]:
-                proteins[seqid]['hmmsearch'] = []
-
-        # parse the hmmsearch output file
-        seqid = None
-        for l in open(hmmsearch3_out):
-            words = l.split()
-
-            if l.startswith(">>"):
-                seqid = parse_fasta_header(l[3:])[0]
-                continue
-
-            if seqid is None:
-                continue
-
-            if 'conditional E-value' in l:
-                evalue = float(words[-1])
-                score = float(words[-5])
-                if evalue <= params['hmm_evalue_max'] and \
-                        score >= params['hmm_score_min']:
-                    proteins[seqid]['hmmsearch'].append(hmm_name)
+    jobs = [(params, cmd_template, hmm_profile)
+            for hmm_profile in glob.glob(file_tag)]
+    if not jobs:
+        return proteins
+
+    results = map_in_pool(search_hmm_profile, jobs)
+
+    # results come back in the same order as the profiles were globbed
+    for hmm_name, hits in results:
+        for seqid in hits:
+            proteins[seqid]['hmmsearch'].append(hmm_name)
 
     return proteins
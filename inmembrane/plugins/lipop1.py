@@ -11,6 +11,10 @@ citation = {'ref': u"Agnieszka S. Juncker, Hanni Willenbrock, "
             'name': 'LipoP 1.0'
             }
 
+# the result line for each sequence, eg:
+#   # SPy_0004 SpII score=19.0475 margin=13.9958 cleavage=16-17 Pos+2=S
+lipop_score_line_re = re.compile(r'^.*SpII score.*$', re.M)
+
 
 def annotate(params, proteins):
     """
@@ -49,20 +53,20 @@ def parse_lipop(text, proteins, id_mapping=None):
         proteins[seqid]['is_lipop'] = False
         proteins[seqid]['lipop_cleave_position'] = None
 
-    for l in text.split('\n'):
+    for match in lipop_score_line_re.finditer(text):
+        l = match.group()
         words = l.split()
 
-        if 'SpII score' in l:
-            seqid = parse_fasta_header(words[1])[0]
-            if id_mapping:
-                seqid = id_mapping[seqid]
-            if 'cleavage' in l:
-                pair = words[5].split("=")[1]
-                i = int(pair.split('-')[0])
-            else:
-                i = None
-            proteins[seqid]['is_lipop'] = 'Sp' in words[2]
-            proteins[seqid]['lipop_cleave_position'] = i
+        seqid = parse_fasta_header(words[1])[0]
+        if id_mapping:
+            seqid = id_mapping[seqid]
+        if 'cleavage' in l:
+            pair = words[5].split("=")[1]
+            i = int(pair.split('-')[0])
+        else:
+            i = None
+        proteins[seqid]['is_lipop'] = 'Sp' in words[2]
+        proteins[seqid]['lipop_cleave_position'] = i
 
         # check for an E.coli style inner membrane retention signal
         # Asp+2 to cleavage site. There are other apparent retention
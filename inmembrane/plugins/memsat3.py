@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import os
-import re
-from inmembrane.helpers import seqid_to_filename, run, write_proteins_fasta
+import shutil
+import tempfile
+from inmembrane.helpers import seqid_to_filename, run, map_in_pool
 
 citation = {'ref': u"﻿Jones DT. Improving the accuracy of transmembrane "
                    u"protein topology prediction using evolutionary "
@@ -20,30 +21,34 @@ def parse_memsat(protein, memsat_out):
     """
 
     f = open(memsat_out)
-    l = f.readline()
-    while l:
-        l = f.readline()
+    lines = f.readlines()
+    f.close()
 
-        if l == "FINAL PREDICTION\n":
-            f.readline()
-            l = f.readline()
-            s = l.split(":")
+    # the first line is never a header, so start looking from the second
+    i_line = 1
+    while i_line < len(lines):
+        l = lines[i_line]
+        i_line += 1
 
-            while re.match("\d", l[0]):
-                tokens = s[1].strip().split()
+        if l == "FINAL PREDICTION\n":
+            # skip the underline, then read one helix per line, eg:
+            #   1:	(in) 8-27	(17.99)
+            #   2:	44-68	(23.11)
+            i_line += 1
+            while i_line < len(lines) and lines[i_line][:1].isdigit():
+                tokens = lines[i_line].split(":")[1].strip().split()
                 tok_offset = 0
                 if len(tokens) > 2:
                     tok_offset = 1
                     side_of_membrane_nterminus = tokens[0][
                                                  1:-1]  # 'in' or 'out'
-                i = int(tokens[tok_offset].split('-')[0])
-                j = int(tokens[tok_offset].split('-')[1])
-                protein['memsat3_helices'].append((i, j))
+                i, j = tokens[tok_offset].split('-')
+                protein['memsat3_helices'].append((int(i), int(j)))
                 score = float(tokens[1 + tok_offset][1:-1])
                 protein['memsat3_scores'].append(score)
-                l = f.readline()
-                s = l.split(":")
-            f.readline()
+                i_line += 1
+            # skip the line ending the helices and the one after it
+            i_line += 2
 
             # record inner and outer loops
             inner_loops = protein['memsat3_inner_loops']
@@ -58,9 +63,8 @@ def parse_memsat(protein, memsat_out):
             # figure out helices
             for tm in protein['memsat3_helices']:
                 loop_end = tm[0] - 1
-                loop = (loop_start, loop_end)
                 loops.append((loop_start, loop_end))
-                if loops == outer_loops:
+                if loops is outer_loops:
                     loops = inner_loops
                 else:
                     loops = outer_loops
@@ -71,8 +75,6 @@ def parse_memsat(protein, memsat_out):
             loop_end = sequence_length
             loops.append((loop_start, loop_end))
 
-    f.close()
-
 
 def has_transmembrane_in_globmem(globmem_out):
     for l in open(globmem_out):
@@ -81,6 +83,31 @@ def has_transmembrane_in_globmem(globmem_out):
     return True
 
 
+def run_memsat(job):
+    """
+    Runs MEMSAT3 on a single-sequence FASTA file. Takes a
+    (memsat3_bin, single_fasta) tuple so that it can be mapped over a
+    multiprocessing pool.
+    """
+    memsat3_bin, single_fasta = job
+    memsat_out = single_fasta.replace('fasta', 'memsat')
+    globmem_out = single_fasta.replace('fasta', 'globmem')
+
+    # runmemsat, like PSIPRED's runpsipred, writes its BLAST and makemat
+    # scratch files (psitmp.*) to the working directory, so each run gets
+    # a directory of its own and only the results are moved back
+    work_dir = tempfile.mkdtemp(prefix='memsat3_', dir='.')
+    try:
+        shutil.copy(single_fasta, work_dir)
+        run('%s %s' % (memsat3_bin, single_fasta),
+            os.path.join(work_dir, memsat_out), cwd=work_dir)
+        for out in [memsat_out, globmem_out]:
+            if os.path.isfile(os.path.join(work_dir, out)):
+                shutil.move(os.path.join(work_dir, out), out)
+    finally:
+        shutil.rmtree(work_dir)
+
+
 def annotate(params, proteins):
     """
     Runs MEMSAT3 and parses the output files. Takes a standard 'inmembrane'
@@ -88,7 +115,8 @@ def annotate(params, proteins):
     results.
 
     In the current implementation, this function extracts and feeds sequences to MEMSAT3
-    one by one via a temporary file.
+    one by one via a temporary file, running as many MEMSAT3 processes at
+    once as there are processors.
 
     These keys are added to the proteins dictionary:
       - 'memsat3_helices', a list of tuples describing the first and last residue
@@ -104,6 +132,7 @@ def annotate(params, proteins):
          number of each predicted outer loop segment;
     """
 
+    jobs = []
     for seqid in proteins:
         protein = proteins[seqid]
 
@@ -115,14 +144,32 @@ def annotate(params, proteins):
             'memsat3_outer_loops': []
         })
 
-        # write seq to single fasta file
         single_fasta = seqid_to_filename(seqid) + '.fasta'
+        memsat_out = single_fasta.replace('fasta', 'memsat')
+        if os.path.isfile(memsat_out):
+            continue
+
+        # write seq to single fasta file, wrapped at 50 residues
         if not os.path.isfile(single_fasta):
-            write_proteins_fasta(single_fasta, proteins, [seqid])
+            seq = protein['seq']
+            seq_wrap = "\n".join(
+                seq[i:i + 50] for i in range(0, len(seq), 50))
+            fd = os.open(single_fasta,
+                         os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0644)
+            try:
+                os.write(fd, ">%s\n%s\n" % (protein['name'], seq_wrap))
+            finally:
+                os.close(fd)
+
+        jobs.append((params['memsat3_bin'], single_fasta))
+
+    # each sequence is an independent MEMSAT3 run, so spread them
+    # over all the available processors
+    map_in_pool(run_memsat, jobs)
 
+    for seqid in proteins:
+        single_fasta = seqid_to_filename(seqid) + '.fasta'
         memsat_out = single_fasta.replace('fasta', 'memsat')
-        run('%s %s' % (params['memsat3_bin'], single_fasta), memsat_out)
-
         globmem_out = single_fasta.replace('fasta', 'globmem')
         if has_transmembrane_in_globmem(globmem_out):
-            parse_memsat(protein, memsat_out)
+            parse_memsat(proteins[seqid], memsat_out)
@@ -10,14 +10,19 @@ citation = {'ref': u"Garrow, A.G., Agnew, A. and Westhead, D.R. TMB-Hunt: An "
 
 __DEBUG__ = False
 
-import sys, os, time, StringIO
+import os, time, re
+from urlparse import urljoin
 
-import twill
-from twill.commands import find, formfile, follow, fv, go, show, \
-    showforms, showlinks, submit, agent
+import requests
+import lxml.html
 
+import inmembrane
 from inmembrane.helpers import log_stderr, parse_fasta_header
 
+# seconds to wait for the server to respond to any single request,
+# so that a stalled connection fails instead of hanging the run
+request_timeout = 120
+
 
 def annotate(params, proteins, \
              force=False):
@@ -39,10 +44,6 @@ def annotate(params, proteins, \
             "# ERROR: TMB-HUNT(web): can't take more than 10,000 sequences.")
         return
 
-    # set the user-agent so web services can block us if they want ... :/
-    python_version = sys.version.split()[0]
-    agent("Python-urllib/%s (twill; inmembrane)" % python_version)
-
     out = 'tmbhunt.out'
     log_stderr("# TMB-HUNT(web) %s > %s" % (params['fasta'], out))
 
@@ -50,11 +51,17 @@ def annotate(params, proteins, \
         log_stderr("# -> skipped: %s already exists" % out)
         return parse_tmbhunt(proteins, out)
 
-    # dump extraneous output into this blackhole so we don't see it
-    if not __DEBUG__: twill.set_output(StringIO.StringIO())
+    # set the user-agent so web services can block us if they want ... :/
+    session = requests.Session()
+    session.headers["User-Agent"] = "python-requests/%s (inmembrane/%s)" % \
+                                    (requests.__version__,
+                                     inmembrane.__version__)
 
-    go("http://bmbpcu36.leeds.ac.uk/~andy/betaBarrel/AACompPred/aaTMB_Hunt.cgi")
-    if __DEBUG__: showforms()
+    url = "http://bmbpcu36.leeds.ac.uk/~andy/betaBarrel/AACompPred/aaTMB_Hunt.cgi"
+    r = session.get(url, timeout=request_timeout)
+    page = lxml.html.fromstring(r.text, base_url=url)
+    form = page.forms[0]
+    if __DEBUG__: log_stderr(str(form.form_values()))
 
     # read up the FASTA format seqs
     fh = open(params['fasta'], 'r')
@@ -62,27 +69,31 @@ def annotate(params, proteins, \
     fh.close()
 
     # fill out the form
-    fv("1", "sequences", fasta_seqs)
+    data = dict(form.form_values())
+    data["sequences"] = fasta_seqs
 
-    submit()
-    if __DEBUG__: showlinks()
+    r = session.post(form.action or url, data=data,
+                     timeout=request_timeout)
+    if __DEBUG__: log_stderr(r.text)
 
     # small jobs will lead us straight to the results, big jobs
     # go via a 'waiting' page which we skip past if we get it
     job_id = None
-    try:
-        # we see this with big jobs
-        result_table_url = follow(
-            "http://www.bioinformatics.leeds.ac.uk/~andy/betaBarrel/AACompPred/tmp/tmp_output.*.html")
-        job_id = result_table_url.split('tmp_output')[-1:][0].split('.')[0]
-    except:
-        # small jobs take us straight to the html results table
-        pass
-
-    # parse the job_id from the url, since due to a bug in
-    # TMB-HUNT the link on the results page from large jobs is wrong
-    if not job_id: job_id = \
-    follow("Full results").split('/')[-1:][0].split('.')[0]
+    # we see this with big jobs
+    match = re.search(r'tmp/tmp_output(\w+)\.html', r.text)
+    if match:
+        job_id = match.group(1)
+    else:
+        # small jobs take us straight to the html results table.
+        # parse the job_id from the url, since due to a bug in
+        # TMB-HUNT the link on the results page from large jobs is wrong
+        links = lxml.html.fromstring(r.text).xpath(
+            '//a[contains(text(), "Full results")]/@href')
+        if links:
+            job_id = links[0].split('/')[-1:][0].split('.')[0]
+    if not job_id:
+        log_stderr("# TMB-HUNT error: Can't find job id")
+        return
     log_stderr(
         "# TMB-HUNT(web) job_id is: %s <http://www.bioinformatics.leeds.ac.uk/~andy/betaBarrel/AACompPred/tmp/tmp_output%s.html>" % (
         job_id, job_id))
@@ -90,27 +101,24 @@ def annotate(params, proteins, \
     # polling until TMB-HUNT finishes
     # TMB-HUNT advises that 4000 sequences take ~10 mins
     # we poll a little faster than that
+    result_url = urljoin(url, "tmp/%s.txt" % (job_id))
     polltime = (len(proteins) * 0.1) + 2
     while True:
         log_stderr("# TMB-HUNT(web): waiting another %i sec ..." % (polltime))
         time.sleep(polltime)
-        try:
-            go(
-                "http://bmbpcu36.leeds.ac.uk/~andy/betaBarrel/AACompPred/tmp/%s.txt" % (
-                job_id))
+        r = session.get(result_url, timeout=request_timeout)
+        if r.status_code == 200:
             break
-        except:
-            polltime = polltime * 2
+        polltime = polltime * 2
 
         if polltime >= 7200:  # 2 hours
             log_stderr("# TMB-HUNT error: Taking too long.")
             return
 
-    txt_out = show()
-
-    # write raw TMB-HUNT results
-    fh = open(out, 'w')
-    fh.write(txt_out)
+    # write raw TMB-HUNT results, as the bytes the server sent, since
+    # r.text is unicode and can't be written out if a header isn't ASCII
+    fh = open(out, 'wb')
+    fh.write(r.content)
     fh.close()
 
     return parse_tmbhunt(proteins, out)
@@ -121,19 +129,20 @@ def parse_tmbhunt(proteins, out):
     Takes the filename of a TMB-HUNT output file (text format)
     & parses the outer membrane beta-barrel predictions into the proteins dictionary.
     """
+    # TMB-HUNT munges FASTA ids by making them all uppercase,
+    # so we map them back to the equivalent any-case id in our
+    # proteins list. ugly but necessary.
+    seqids_by_upper = dict((i.upper(), i) for i in proteins)
+
     # parse TMB-HUNT text output
     tmbhunt_classes = {}
     for l in open(out, 'r'):
         # inmembrane.log_stderr("# TMB-HUNT raw: " + l[:-1])
         if l[0] == ">":
-            # TMB-HUNT munges FASTA ids by making them all uppercase,
-            # so we find the equivalent any-case id in our proteins list
-            # and use that. ugly but necessary.
             seqid, desc = parse_fasta_header(l)
-            for i in proteins.keys():
-                if seqid.upper() == i.upper():
-                    seqid = i
-                    desc = proteins[i]['name']
+            if seqid.upper() in seqids_by_upper:
+                seqid = seqids_by_upper[seqid.upper()]
+                desc = proteins[seqid]['name']
 
             probability = None
             classication = None
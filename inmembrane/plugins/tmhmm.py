@@ -39,6 +39,14 @@ def annotate(params, proteins):
     return parse_tmhmm(open('tmhmm.out').read(), proteins)
 
 
+# maps the feature column of tmhmm output lines to the proteins fields
+tmhmm_feature_fields = {
+    'inside': 'tmhmm_inner_loops',
+    'outside': 'tmhmm_outer_loops',
+    'TMhelix': 'tmhmm_helices',
+}
+
+
 def parse_tmhmm(text, proteins, id_mapping=[]):
     seqid = None
     for i_line, l in enumerate(text.split('\n')):
@@ -48,10 +56,16 @@ def parse_tmhmm(text, proteins, id_mapping=[]):
         if not words:
             continue
 
+        # lines look like either:
+        #   # SPy_1392 Length: 398
+        #   SPy_1392	TMHMM2.0	TMhelix	     7    29
         if l.startswith("#"):
             seqid = parse_fasta_header(words[1])[0]
+            field = None
         else:
             seqid = parse_fasta_header(words[0])[0]
+            field = tmhmm_feature_fields.get(words[2]) \
+                if len(words) > 2 else None
         if seqid is None:
             continue
 
@@ -60,21 +74,15 @@ def parse_tmhmm(text, proteins, id_mapping=[]):
             seqid = id_mapping[seqid]
 
         # initialize fields in proteins[seqid]
-        if 'tmhmm_helices' not in proteins[seqid]:
-            proteins[seqid].update({
+        protein = proteins[seqid]
+        if 'tmhmm_helices' not in protein:
+            protein.update({
                 'tmhmm_helices': [],
                 'tmhmm_inner_loops': [],
                 'tmhmm_outer_loops': []
             })
 
-        if 'inside' in l:
-            proteins[seqid]['tmhmm_inner_loops'].append(
-                (int(words[-2]), int(words[-1])))
-        if 'outside' in l:
-            proteins[seqid]['tmhmm_outer_loops'].append(
-                (int(words[-2]), int(words[-1])))
-        if 'TMhelix' in l:
-            proteins[seqid]['tmhmm_helices'].append(
-                (int(words[-2]), int(words[-1])))
+        if field:
+            protein[field].append((int(words[-2]), int(words[-1])))
 
     return proteins
@@ -48,7 +48,7 @@ def get_annotations(params):
 def post_process_protein(params, protein):
     def has_tm_helix(protein):
         for program in params['helix_programs']:
-            if dict_get(protein, '%s_helices' % program):
+            if protein.get('%s_helices' % program, False):
                 return True
         return False
 
@@ -75,11 +75,10 @@ def post_process_protein(params, protein):
         return has_long_loops(protein, '_inner_loops', loop_length)
 
     details = []
-    category = "UNKNOWN"
-    is_hmm_profile_match = dict_get(protein, 'hmmsearch')
-    is_signalp = dict_get(protein, 'is_signalp')
-    is_tatfind = dict_get(protein, 'is_tatfind')
-    is_lipop = dict_get(protein, 'is_lipop')
+    is_hmm_profile_match = protein.get('hmmsearch', False)
+    is_signalp = protein.get('is_signalp', False)
+    is_tatfind = protein.get('is_tatfind', False)
+    is_lipop = protein.get('is_lipop', False)
 
     # in terms of most sublocalization logic, a Tat signal is similar to a
     # Sec (signalp) signal. We use has_signal_pept to denote that either
@@ -93,7 +92,7 @@ def post_process_protein(params, protein):
     # annotate the barrels - high scoring bomp hits don't require a
     # signal peptide, low scoring ones do
     has_barrel = False
-    bomp_score = dict_get(protein, 'bomp')
+    bomp_score = protein.get('bomp', False)
     if (bomp_score >= params['bomp_clearly_cutoff']) or \
             (has_signal_pept and bomp_score >= params['bomp_maybe_cutoff']):
         details += ['bomp(%i)' % (bomp_score)]
@@ -106,13 +105,10 @@ def post_process_protein(params, protein):
     #  details += ['tmbhunt(%.2f)' % (tmbhunt_prob)]
     #  has_barrel = True
 
-    if has_signal_pept and dict_get(protein, 'is_tmbetadisc_rbf'):
+    if has_signal_pept and protein.get('is_tmbetadisc_rbf', False):
         details += ['tmbetadisc-rbf']
         has_barrel = True
 
-    if has_barrel:
-        category = 'OM(barrel)'
-
     # we only regard the barrel prediction as a true positive
     # if a signal peptide is also present
     #  is_barrel = False
@@ -122,12 +118,12 @@ def post_process_protein(params, protein):
 
     # set number of predicted OM barrel strands in details
     if has_barrel and \
-            dict_get(protein, 'tmbeta_strands'):
+            protein.get('tmbeta_strands', False):
         num_strands = len(protein['tmbeta_strands'])
         details += ['tmbeta_strands(%i)' % (num_strands)]
 
     if has_signal_pept and not is_lipop and \
-            (dict_get(protein, 'signalp_cleave_position')):
+            (protein.get('signalp_cleave_position', False)):
         # we use the SignalP signal peptidase cleavage site for Tat signals
         chop_nterminal_peptide(protein, protein['signalp_cleave_position'])
 
@@ -144,7 +140,10 @@ def post_process_protein(params, protein):
     if is_hmm_profile_match:
         details += ["hmm(%s)" % "|".join(protein['hmmsearch'])]
 
-    if has_tm_helix(protein) and not has_barrel:
+    # the category is settled in one place, barrels taking precedence
+    if has_barrel:
+        category = 'OM(barrel)'
+    elif has_tm_helix(protein):
         for program in params['helix_programs']:
             n = len(protein['%s_helices' % program])
             details += [program + "(%d)" % n]
@@ -154,19 +153,17 @@ def post_process_protein(params, protein):
             category += "+peri"
         if long_in_cytoplasm(protein):
             category += "+cyto"
-    elif not has_barrel:
-        if is_lipop:
-            if dict_get(protein, 'lipop_im_retention_signal'):
-                category = "LIPOPROTEIN(IM)"
-            else:
-                category = "LIPOPROTEIN(OM)"
-            pass
-        elif (has_signal_pept):
-            category = "PERIPLASMIC/SECRETED"
+    elif is_lipop:
+        if protein.get('lipop_im_retention_signal', False):
+            category = "LIPOPROTEIN(IM)"
         else:
-            category = "CYTOPLASM"
+            category = "LIPOPROTEIN(OM)"
+    elif has_signal_pept:
+        category = "PERIPLASMIC/SECRETED"
+    else:
+        category = "CYTOPLASM"
 
-    if details == []:
+    if not details:
         details = ["."]
 
     protein['details'] = details
@@ -176,19 +173,21 @@ def post_process_protein(params, protein):
 
 
 def protein_output_line(seqid, proteins):
+    protein = proteins[seqid]
     return '%-15s   %-13s  %-50s  %s' % \
            (seqid,
-            proteins[seqid]['category'],
-            ";".join(proteins[seqid]['details']),
-            proteins[seqid]['name'][:60])
+            protein['category'],
+            ";".join(protein['details']),
+            protein['name'][:60])
 
 
 def protein_csv_line(seqid, proteins):
+    protein = proteins[seqid]
     return '%s,%s,%s,"%s"\n' % \
            (seqid,
-            proteins[seqid]['category'],
-            ";".join(proteins[seqid]['details']),
-            proteins[seqid]['name'])
+            protein['category'],
+            ";".join(protein['details']),
+            protein['name'])
 
 
 def summary_table(params, proteins):
@@ -198,8 +197,8 @@ def summary_table(params, proteins):
     """
     out = ""
     counts = {}
-    for seqid in proteins:
-        category = proteins[seqid]['category']
+    for protein in proteins.itervalues():
+        category = protein['category']
 
         if category not in counts:
             counts[category] = 1
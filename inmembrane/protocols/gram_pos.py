@@ -1,5 +1,5 @@
 import os
-from inmembrane.helpers import dict_get, chop_nterminal_peptide
+from inmembrane.helpers import chop_nterminal_peptide
 
 
 def get_annotations(params):
@@ -30,7 +30,7 @@ def get_annotations(params):
 
     annotations += ['hmmsearch3']
 
-    if dict_get(params, 'helix_programs'):
+    if params.get('helix_programs'):
         if 'tmhmm' in params['helix_programs']:
             if not params['tmhmm_bin'] or params[
                 'tmhmm_bin'] == 'tmhmm_scrape_web':
@@ -60,8 +60,6 @@ def eval_surface_exposed_loop(
     longer than the given thresholds.
     """
 
-    outer_loops = outer_loops[:]
-
     if n_transmembrane_region == 0:
         # treat protein as one entire exposed loop
         return sequence_length >= terminal_exposed_loop_min
@@ -71,24 +69,24 @@ def eval_surface_exposed_loop(
 
     loop_len = lambda loop: abs(loop[1] - loop[0]) + 1
 
+    # the internal loops are outer_loops[first:last]
+    first, last = 0, len(outer_loops)
+
     # if the N-terminal loop sticks outside
     if outer_loops[0][0] == 1:
-        nterminal_loop = outer_loops[0]
-        del outer_loops[0]
-        if loop_len(nterminal_loop) >= terminal_exposed_loop_min:
+        first = 1
+        if loop_len(outer_loops[0]) >= terminal_exposed_loop_min:
             return True
 
     # if the C-terminal loop sticks outside
-    if outer_loops:
-        if outer_loops[-1][-1] == sequence_length:
-            cterminal_loop = outer_loops[-1]
-            del outer_loops[-1]
-            if loop_len(cterminal_loop) >= terminal_exposed_loop_min:
-                return True
+    if last > first and outer_loops[-1][-1] == sequence_length:
+        last -= 1
+        if loop_len(outer_loops[-1]) >= terminal_exposed_loop_min:
+            return True
 
     # test remaining outer loops for length
-    for loop in outer_loops:
-        if loop_len(loop) >= internal_exposed_loop_min:
+    for i in range(first, last):
+        if loop_len(outer_loops[i]) >= internal_exposed_loop_min:
             return True
 
     return False
@@ -148,17 +146,19 @@ def post_process_protein(params, protein):
     can determine the final analysis.
     """
 
+    helix_programs = params['helix_programs']
+
     def sequence_length(protein):
         return protein['sequence_length']
 
     def has_tm_helix(protein):
-        for program in params['helix_programs']:
-            if dict_get(protein, '%s_helices' % program):
+        for program in helix_programs:
+            if protein.get('%s_helices' % program):
                 return True
         return False
 
     def has_surface_exposed_loop(protein):
-        for program in params['helix_programs']:
+        for program in helix_programs:
             if eval_surface_exposed_loop(
                     protein['sequence_length'],
                     len(protein['%s_helices' % (program)]),
@@ -170,7 +170,7 @@ def post_process_protein(params, protein):
 
     def exposed_loop_extent(protein):
         extents = []
-        for program in params['helix_programs']:
+        for program in helix_programs:
             if program + '_helices' in protein:
                 extents.append(max_exposed_loop(
                     protein['sequence_length'],
@@ -186,11 +186,11 @@ def post_process_protein(params, protein):
     terminal_exposed_loop_min = \
         params['terminal_exposed_loop_min']
 
-    is_hmm_profile_match = dict_get(protein, 'hmmsearch')
-    is_lipop = dict_get(protein, 'is_lipop')
+    is_hmm_profile_match = protein.get('hmmsearch', False)
+    is_lipop = protein.get('is_lipop', False)
     if is_lipop:
         i_lipop_cut = protein['lipop_cleave_position']
-    is_signalp = dict_get(protein, 'is_signalp')
+    is_signalp = protein.get('is_signalp', False)
     if is_signalp:
         i_signalp_cut = protein['signalp_cleave_position']
 
@@ -201,7 +201,7 @@ def post_process_protein(params, protein):
         details += ["lipop"]
     if is_signalp:
         details += ["signalp"]
-    for program in params['helix_programs']:
+    for program in helix_programs:
         if has_tm_helix(protein):
             n = len(protein['%s_helices' % program])
             details += [program + "(%d)" % n]
@@ -230,7 +230,7 @@ def post_process_protein(params, protein):
         else:
             category = "CYTOPLASM(non-PSE)"
 
-    if details == []:
+    if not details:
         details = ["."]
 
     protein['details'] = details
@@ -244,21 +244,23 @@ def post_process_protein(params, protein):
 
 
 def protein_output_line(seqid, proteins):
+    protein = proteins[seqid]
     return '%-15s   %-18s  %-4s %-50s  %s' % \
            (seqid,
-            proteins[seqid]['category'],
-            proteins[seqid]['loop_extent'],
-            ";".join(proteins[seqid]['details']),
-            proteins[seqid]['name'][:60])
+            protein['category'],
+            protein['loop_extent'],
+            ";".join(protein['details']),
+            protein['name'][:60])
 
 
 def protein_csv_line(seqid, proteins):
+    protein = proteins[seqid]
     return '%s,%s,%s,%s,"%s"\n' % \
            (seqid,
-            proteins[seqid]['category'],
-            proteins[seqid]['loop_extent'],
-            ";".join(proteins[seqid]['details']),
-            proteins[seqid]['name'])
+            protein['category'],
+            protein['loop_extent'],
+            ";".join(protein['details']),
+            protein['name'])
 
 
 def summary_table(params, proteins):
@@ -268,8 +270,8 @@ def summary_table(params, proteins):
     """
     out = ""
     counts = {}
-    for seqid in proteins:
-        category = proteins[seqid]['category']
+    for protein in proteins.itervalues():
+        category = protein['category']
 
         if category not in counts:
             counts[category] = 1
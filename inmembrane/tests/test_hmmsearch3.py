@@ -1,6 +1,7 @@
 import os
 import unittest
 import sys
+import shutil
 
 import inmembrane
 import inmembrane.tests
@@ -38,6 +39,17 @@ class TestHmmsearch3(PluginTestBase):
             self.assertEqual(self.proteins[seqid]['hmmsearch'],
                              self.expected_output[seqid]['hmmsearch'])
 
+    def test_search_hmm_profile(self):
+        # hmm.LPxTG.out is the output of hmmsearch for input.fasta;
+        # run skips hmmsearch since the output file already exists.
+        # The SPy_0191a domain has a good E-value but too low a score
+        shutil.copyfile(
+            os.path.join(self.test_data_dir, 'hmm.LPxTG.out'),
+            'hmm.LPxTG.out')
+        job = (self.params, 'hmmsearch %s input.fasta', 'LPxTG.hmm')
+        self.assertEqual(hmmsearch3.search_hmm_profile(job),
+                         ('LPxTG', ['SPy_0128']))
+
 
 if __name__ == '__main__':
     unittest.main()
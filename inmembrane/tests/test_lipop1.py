@@ -18,7 +18,21 @@ class TestLipoP(PluginTestBase):
             self.params['lipop1_bin'] = 'LipoP'
 
         lipop1.annotate(self.params, self.proteins)
-
+        self.check_expected_output()
+
+    def test_parse_lipop(self):
+        # lipop.out is the output of LipoP for input.fasta
+        text = open(os.path.join(self.test_data_dir, 'lipop.out')).read()
+        lipop1.parse_lipop(text, self.proteins)
+        self.check_expected_output()
+        self.assertEqual(self.proteins[u'SPy_0252']['lipop_cleave_position'],
+                         21)
+        self.assertEqual(self.proteins[u'SPy_2077']['lipop_cleave_position'],
+                         None)
+        self.assertNotIn('lipop_im_retention_signal',
+                         self.proteins[u'SPy_0252'])
+
+    def check_expected_output(self):
         self.expected_output = {
             u'SPy_0252': True,
             u'SPy_2077': False,
@@ -35,6 +49,5 @@ class TestLipoP(PluginTestBase):
         self.assertTrue(
             self.proteins[u'tr|Q9HYX8']['lipop_im_retention_signal'])
 
-
 if __name__ == '__main__':
     unittest.main()
@@ -1,8 +1,14 @@
+import os, tempfile, shutil
+import json
+import sqlite3
 import unittest
+from collections import OrderedDict
 from semantic_version import Version as SemanticVersion
 
 from inmembrane.tests.PluginTestBase import PluginTestBase
 import inmembrane
+from inmembrane import helpers
+from inmembrane.protocols import gram_pos
 
 
 class TestBomp(PluginTestBase):
@@ -15,5 +21,226 @@ class TestBomp(PluginTestBase):
         self.assertEqual(str(version), inmembrane.__version__)
 
 
+class TestSplitCommand(unittest.TestCase):
+    def setUp(self):
+        self.old_test_dir = os.environ.get('INMEMBRANE_TEST_DIR')
+        os.environ['INMEMBRANE_TEST_DIR'] = '/opt/signalp'
+
+    def tearDown(self):
+        if self.old_test_dir is None:
+            del os.environ['INMEMBRANE_TEST_DIR']
+        else:
+            os.environ['INMEMBRANE_TEST_DIR'] = self.old_test_dir
+
+    def test_split_command(self):
+        home = os.path.expanduser('~')
+        self.assertEqual(
+            helpers.split_command(
+                '~/bin/signalp -t gram+  $INMEMBRANE_TEST_DIR/input.fasta'),
+            [home + '/bin/signalp', '-t', 'gram+',
+             '/opt/signalp/input.fasta'])
+
+
+class TempDirTestBase(unittest.TestCase):
+    _name = ""
+
+    def setUp(self):
+        """
+        Creates a temporary directory (eg /tmp/.inmembrane_json_TleeRw ) for
+        the files written by a test, which is removed afterwards.
+
+        Subclasses should set self._name.
+        """
+        self.output_dir = tempfile.mkdtemp(
+            prefix=".inmembrane_%s_" % (self._name))
+
+    def tearDown(self):
+        shutil.rmtree(self.output_dir)
+
+
+class TestFasta(TempDirTestBase):
+    _name = "fasta"
+
+    def setUp(self):
+        TempDirTestBase.setUp(self)
+        self.fasta = os.path.join(self.output_dir, "input.fasta")
+
+    def test_parse_fasta_header(self):
+        self.assertEqual(
+            helpers.parse_fasta_header('>gi|123|gb|ABC.1| some protein'),
+            ('gi|123', 'some protein'))
+        self.assertEqual(
+            helpers.parse_fasta_header('>SPy_0008 from AE004092'),
+            ('SPy_0008', 'SPy_0008 from AE004092'))
+        # a database tag with no id isn't taken as an NCBI id
+        self.assertEqual(helpers.parse_fasta_header('b|'), ('b|', 'b|'))
+
+    def test_create_proteins_dict(self):
+        f = open(self.fasta, 'wb')
+        f.write("text before the first header is ignored\r\n"
+                ">gi|1|gb|X| first protein\r\n"
+                "ACD EF\r\n"
+                "GH\r\n"
+                ">p2 second protein\n"
+                "MK\n"
+                ">p3\n")
+        f.close()
+        seqids, proteins = helpers.create_proteins_dict(self.fasta)
+        self.assertEqual(seqids, ['gi|1', 'p2', 'p3'])
+        # CRLF line endings and spaces within a line are dropped
+        self.assertEqual(proteins['gi|1']['seq'], 'ACDEFGH')
+        self.assertEqual(proteins['gi|1']['sequence_length'], 7)
+        self.assertEqual(proteins['gi|1']['name'], 'first protein')
+        self.assertEqual(
+            proteins['gi|1']['original_header'], 'gi|1|gb|X| first protein')
+        self.assertEqual(proteins['p2']['seq'], 'MK')
+        self.assertEqual(proteins['p2']['name'], 'p2 second protein')
+        # an empty last record gives an empty sequence
+        self.assertEqual(proteins['p3']['seq'], '')
+        self.assertEqual(proteins['p3']['sequence_length'], 0)
+
+
+class TestWriteProteinsJson(TempDirTestBase):
+    _name = "json"
+
+    def setUp(self):
+        TempDirTestBase.setUp(self)
+        self.json = os.path.join(self.output_dir, "proteins.json")
+
+    def test_write_proteins_json(self):
+        proteins = OrderedDict([
+            ('gi|1', {'name': 'first protein',
+                      'category': 'PSE-Membrane',
+                      'details': ['tmhmm(1)'],
+                      'tmhmm_helices': [(7, 29)]}),
+            ('p2', {'name': 'Prot\xe9ine', 'category': 'CYTOPLASM'}),
+        ])
+        helpers.write_proteins_json(self.json, proteins)
+        result = json.load(open(self.json))
+        self.assertEqual(sorted(result), [u'gi|1', u'p2'])
+        self.assertEqual(result['gi|1']['tmhmm_helices'], [[7, 29]])
+        self.assertEqual(result['gi|1']['details'], [u'tmhmm(1)'])
+        # a Latin-1 header is written with a replacement character
+        self.assertEqual(result['p2']['name'], u'Prot\ufffdine')
+
+
+class TestWriteProteinsSqlite(TempDirTestBase):
+    _name = "sqlite"
+
+    def setUp(self):
+        TempDirTestBase.setUp(self)
+        self.db = os.path.join(self.output_dir, "proteins.db")
+
+    def fetch_rows(self):
+        conn = sqlite3.connect(self.db)
+        rows = conn.execute(
+            "SELECT * FROM proteins ORDER BY source, seqid").fetchall()
+        conn.close()
+        return rows
+
+    def test_write_proteins_sqlite(self):
+        proteins = OrderedDict([
+            ('gi|1', {'name': 'first protein',
+                      'category': 'PSE-Membrane',
+                      'loop_extent': 30,
+                      'details': ['signalp', 'tmhmm(1)']}),
+            ('p2', {'name': 'Prot\xe9ine',
+                    'category': 'CYTOPLASM',
+                    'details': ['.']}),
+        ])
+        helpers.write_proteins_sqlite(self.db, proteins, 'a.fasta')
+        self.assertEqual(self.fetch_rows(), [
+            (u'a.fasta', u'gi|1', u'PSE-Membrane', u'30',
+             u'signalp;tmhmm(1)', u'first protein'),
+            # a Latin-1 header is stored with a replacement character
+            (u'a.fasta', u'p2', u'CYTOPLASM', None, u'.', u'Prot\ufffdine'),
+        ])
+
+        # running again replaces the rows of the same sequence ids
+        proteins['p2']['category'] = 'SECRETED'
+        helpers.write_proteins_sqlite(self.db, proteins, 'a.fasta')
+        rows = self.fetch_rows()
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2], u'SECRETED')
+
+    def test_shared_seqid(self):
+        # two proteomes with the same sequence id keep a row each
+        helpers.write_proteins_sqlite(self.db, {
+            'SPy_0008': {'name': 'strain A', 'category': 'CYTOPLASM',
+                         'details': ['.']}}, 'a.fasta')
+        helpers.write_proteins_sqlite(self.db, {
+            'SPy_0008': {'name': 'strain B', 'category': 'SECRETED',
+                         'details': ['signalp']}}, 'b.fasta')
+        rows = self.fetch_rows()
+        self.assertEqual(
+            [(row[0], row[1], row[2]) for row in rows],
+            [(u'a.fasta', u'SPy_0008', u'CYTOPLASM'),
+             (u'b.fasta', u'SPy_0008', u'SECRETED')])
+
+
+class TestChopNterminalPeptide(unittest.TestCase):
+    def setUp(self):
+        self.protein = {
+            'seq': 'M' * 100,
+            'sequence_length': 100,
+            'tmhmm_helices': [(5, 25), (40, 60)],
+            'tmhmm_inner_loops': [(1, 4), (61, 100)],
+            'tmhmm_outer_loops': [(26, 39)],
+        }
+
+    def test_cut_in_loop(self):
+        helices = self.protein['tmhmm_helices']
+        helpers.chop_nterminal_peptide(self.protein, 2)
+        self.assertEqual(self.protein['sequence_length'], 98)
+        # the loop cut in two now starts at the new N-terminus
+        self.assertEqual(self.protein['tmhmm_inner_loops'], [(1, 2), (59, 98)])
+        self.assertEqual(self.protein['tmhmm_outer_loops'], [(24, 37)])
+        self.assertEqual(self.protein['tmhmm_helices'], [(3, 23), (38, 58)])
+        # the lists are changed in place
+        self.assertTrue(self.protein['tmhmm_helices'] is helices)
+        self.assertEqual(self.protein['seq'], 'M' * 100)
+
+    def test_cut_in_helix(self):
+        helpers.chop_nterminal_peptide(self.protein, 10)
+        self.assertEqual(self.protein['sequence_length'], 90)
+        # the loop before the cut is gone, as is the helix cut in two
+        self.assertEqual(self.protein['tmhmm_inner_loops'], [(51, 90)])
+        self.assertEqual(self.protein['tmhmm_outer_loops'], [(16, 29)])
+        self.assertEqual(self.protein['tmhmm_helices'], [(30, 50)])
+
+
+class TestEvalSurfaceExposedLoop(unittest.TestCase):
+    def is_exposed(self, n_tm, outer_loops):
+        # a 200 residue protein, with terminal loops needing 50 residues
+        # and internal loops 20 to be surface exposed
+        return gram_pos.eval_surface_exposed_loop(
+            200, n_tm, outer_loops, 50, 20)
+
+    def test_no_helices(self):
+        self.assertTrue(self.is_exposed(0, []))
+        self.assertFalse(gram_pos.eval_surface_exposed_loop(
+            40, 0, [], 50, 20))
+
+    def test_no_outer_loops(self):
+        self.assertFalse(self.is_exposed(1, []))
+
+    def test_terminal_loops(self):
+        self.assertTrue(self.is_exposed(1, [(1, 60)]))
+        self.assertTrue(self.is_exposed(1, [(141, 200)]))
+        # terminal loops are held to the terminal length
+        self.assertFalse(self.is_exposed(2, [(1, 30), (171, 200)]))
+        # a single loop covering both termini is only an N-terminal loop
+        self.assertFalse(self.is_exposed(1, [(1, 30)]))
+
+    def test_internal_loops(self):
+        self.assertTrue(self.is_exposed(2, [(1, 10), (51, 70)]))
+        self.assertFalse(self.is_exposed(2, [(51, 69), (191, 200)]))
+
+    def test_outer_loops_unchanged(self):
+        outer_loops = [(1, 10), (51, 60), (191, 200)]
+        self.is_exposed(3, outer_loops)
+        self.assertEqual(outer_loops, [(1, 10), (51, 60), (191, 200)])
+
+
 if __name__ == '__main__':
     unittest.main()